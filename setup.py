@@ -0,0 +1,37 @@
+"""
+Optional mypyc build
+
+Project metadata lives in pyproject.toml; this file only exists so that
+shouldpy/should.py can be compiled with mypyc when requested:
+
+    pip install "mypy>=1.20"
+    SHOULDPY_USE_MYPYC=1 pip install --no-build-isolation .
+
+Without SHOULDPY_USE_MYPYC the package is installed as pure Python.
+
+Older mypyc releases miscompile the module: before 1.19 the streaming async
+verdict fails at runtime, and 1.19 compiles async wrappers that
+inspect.iscoroutinefunction() does not recognize, so pytest-asyncio would
+never await decorated async tests.
+"""
+
+import os
+
+from setuptools import setup
+
+MIN_MYPY_VERSION = (1, 20)
+
+ext_modules = []
+if os.environ.get("SHOULDPY_USE_MYPYC") == "1":
+    from mypy.version import __version__ as mypy_version
+    from mypyc.build import mypycify
+
+    if tuple(int(part) for part in mypy_version.split(".")[:2]) < MIN_MYPY_VERSION:
+        raise RuntimeError(
+            f"SHOULDPY_USE_MYPYC=1 requires mypy>={'.'.join(map(str, MIN_MYPY_VERSION))}, "
+            f"found {mypy_version}"
+        )
+
+    ext_modules = mypycify(["shouldpy/should.py"])
+
+setup(ext_modules=ext_modules)
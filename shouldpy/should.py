@@ -1,14 +1,301 @@
+import asyncio
+import builtins
 import functools
+import hashlib
 import inspect
-import io
 import json
 import logging
+import operator
+import os
+import re
 import sys
 import textwrap
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 from langchain_core.language_models import BaseChatModel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to default when unset or malformed"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Only the last entries of captured logs/prints are sent to the AI model
+_MAX_PROMPT_ENTRIES = 50
+# Passing verdicts of identical reruns are reused for SHOULDPY_CACHE_TTL seconds (0 disables caching)
+_CACHE_TTL = _env_float("SHOULDPY_CACHE_TTL", 3600.0)
+_CACHE_MAXSIZE = 1024
+
+# Operators accepted by the (operator, value) form of the expect argument
+_EXPECT_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda actual, expected: actual in expected,
+    "not in": lambda actual, expected: actual not in expected,
+}
+
+# Judgment prompt, dedented once at import so each call only fills in the fields
+_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    Below is the context information from a test execution, expected condition: "{condition}"
+
+    Execution logs:
+    {logs}
+
+    Print outputs:
+    {prints}
+
+    Function return result:
+    {result}
+
+    Please judge whether the expected condition is satisfied based on logs, print outputs and return result. Response format:
+    PASS  or  FAIL: specific reason
+    No additional explanation needed.
+    """
+)
+
+# Batch judgment prompt, one numbered item per deferred test
+_BATCH_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    Below is the context information from {count} test executions. Judge each test independently.
+
+    {items}
+
+    For each test, judge whether its expected condition is satisfied based on its logs, print outputs and return result. Response format, exactly one line per test:
+    PASS:<test number>  or  FAIL:<test number>:specific reason
+    No additional explanation needed.
+    """
+)
+
+_BATCH_ITEM_TEMPLATE = textwrap.dedent(
+    """
+    Test {index}, expected condition: "{condition}"
+    Execution logs:
+    {logs}
+    Print outputs:
+    {prints}
+    Function return result:
+    {result}
+    """
+).strip()
+
+# Verdict parsing tolerates leading whitespace and lowercase keywords
+_PASS_RE = re.compile(r"\s*PASS\b", re.I)
+_VERDICT_RE = re.compile(r"^\s*(PASS|FAIL)\b\s*:?\s*(.*?)\s*$", re.I | re.S)
+# While streaming, "PASS" only counts once a non-word character follows it,
+# a later chunk could still turn it into "Password"
+_STREAM_PASS_RE = re.compile(r"\s*PASS(?=\W)", re.I)
+_BATCH_VERDICT_RE = re.compile(r"^\s*(PASS|FAIL)\s*:\s*(\d+)\s*(?::\s*(.*?))?\s*$", re.I | re.M)
+
+# Capture target of the test running in the current thread / asyncio task
+_log_sink: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+    "shouldpy_log_sink", default=None
+)
+_print_sink: ContextVar[Optional["_PrintCapture"]] = ContextVar("shouldpy_print_sink", default=None)
+
+
+class _LogCapture(logging.Handler):
+    """Root logging handler that forwards records to the current context's log list"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        sink = _log_sink.get()
+        if sink is not None:
+            sink.append(
+                {
+                    "message": self.format(record),
+                    "level": record.levelname,
+                    "timestamp": record.created,
+                }
+            )
+
+
+class _PrintCapture:
+    """Minimal file-like print target that collects non-empty writes into a list"""
+
+    __slots__ = ("sink",)
+
+    def __init__(self, sink: List[str]):
+        self.sink = sink
+
+    def write(self, s: str) -> int:
+        text = s.strip()
+        if text:  # Ignore empty lines
+            self.sink.append(text)
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+def _capturing_print(*args: Any, **kwargs: Any) -> None:
+    """print() replacement that sends stdout output to the current test's capturer"""
+    capture = _print_sink.get()
+    if capture is not None:
+        target = kwargs.get("file")
+        if target is None or target is sys.stdout:
+            kwargs["file"] = capture
+    _original_print(*args, **kwargs)
+
+
+_log_handler = _LogCapture()
+_capture_lock = threading.Lock()
+_capture_installed = False
+_original_print = builtins.print
+_capture_depth = 0
+_saved_root_level = logging.NOTSET
+
+
+def _install_capture() -> None:
+    """Install the print shim, only the first time"""
+    global _capture_installed, _original_print
+    with _capture_lock:
+        if _capture_installed:
+            return
+        _original_print = builtins.print
+        builtins.print = _capturing_print
+        _capture_installed = True
+
+
+# ContextVar tokens returned by _start_capture, None for outputs left uncaptured
+_CaptureTokens = Tuple[
+    Optional["Token[Optional[List[Dict[str, Any]]]]"], Optional["Token[Optional[_PrintCapture]]"]
+]
+
+
+def _start_capture(
+    captured_logs: Optional[List[Dict[str, Any]]], captured_prints: Optional[List[str]]
+) -> _CaptureTokens:
+    """
+    Route logs and prints of the current context into the given lists
+
+    Args:
+        captured_logs: List receiving log records, None to leave logging untouched
+        captured_prints: List receiving print outputs, None to leave print untouched
+
+    Returns:
+        Tokens to pass to _stop_capture
+    """
+    global _capture_depth, _saved_root_level
+    log_token = print_token = None
+    if captured_logs is not None:
+        with _capture_lock:
+            # Only the outermost of concurrently running tests touches the root logger
+            if _capture_depth == 0:
+                root_logger = logging.getLogger()
+                root_logger.addHandler(_log_handler)
+                _saved_root_level = root_logger.level
+                root_logger.setLevel(logging.INFO)
+            _capture_depth += 1
+        log_token = _log_sink.set(captured_logs)
+    if captured_prints is not None:
+        print_token = _print_sink.set(_PrintCapture(captured_prints))
+    return log_token, print_token
+
+
+def _stop_capture(tokens: _CaptureTokens) -> None:
+    """Undo _start_capture"""
+    global _capture_depth
+    log_token, print_token = tokens
+    if print_token is not None:
+        _print_sink.reset(print_token)
+    if log_token is not None:
+        _log_sink.reset(log_token)
+        with _capture_lock:
+            _capture_depth -= 1
+            if _capture_depth == 0:
+                root_logger = logging.getLogger()
+                _remove_log_handler(root_logger)
+                root_logger.setLevel(_saved_root_level)
+
+
+def _remove_log_handler(root_logger: logging.Logger) -> None:
+    """
+    Detach _log_handler from the root logger
+
+    It is normally still the last handler since _start_capture appended it, so it
+    is popped directly instead of letting removeHandler scan the handler list.
+    """
+    with logging._lock:  # type: ignore[attr-defined]
+        handlers = root_logger.handlers
+        if handlers and handlers[-1] is _log_handler:
+            handlers.pop()
+            return
+    root_logger.removeHandler(_log_handler)
+
+
+def _warm_up(llm_client: BaseChatModel) -> None:
+    """Send a throwaway prompt to open the client's connection, ignoring any error"""
+    try:
+        llm_client.invoke("Reply with PASS")
+    except Exception:
+        pass
+
+
+async def _awarm_up(llm_client: BaseChatModel) -> None:
+    """Async version of _warm_up, opens the connection of the client's async transport"""
+    try:
+        await llm_client.ainvoke("Reply with PASS")
+    except Exception:
+        pass
+
+
+# Keeps scheduled async warm-up tasks referenced until they finish
+_warmup_tasks: "Set[asyncio.Task[None]]" = set()
+
+
+def _start_warm_up(llm_client: BaseChatModel) -> None:
+    """
+    Warm the LLM client up without blocking the caller
+
+    The sync transport is warmed in a background thread. The async transport is
+    bound to an event loop, so it is only warmed when called from a running loop,
+    as a task scheduled on that loop.
+    """
+    threading.Thread(
+        target=_warm_up, args=(llm_client,), name="shouldpy-warmup", daemon=True
+    ).start()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_awarm_up(llm_client))
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+
+class _PendingAssertion(NamedTuple):
+    """Captured context of a test whose AI judgment is deferred until flush"""
+
+    name: str
+    condition: str
+    logs: List[Dict[str, Any]]
+    prints: List[str]
+    actual_result: Any
+    llm_client: BaseChatModel
+
 
 class ShouldDecorator:
     """
@@ -22,172 +309,511 @@ class ShouldDecorator:
     @should("Expected condition")
     def test_function():
         return some_result()
+
+    Set ``should.batch_mode = True`` to defer judgments, then call
+    ``should.flush()`` (or ``await should.aflush()``) to judge all of them
+    with a single AI call.
     """
 
-    def __init__(self):
-        self._llm_client = None
+    def __init__(self) -> None:
+        self._llm_client: Optional[BaseChatModel] = None
+        self.batch_mode = False
+        self._pending: List[_PendingAssertion] = []
+        self._pending_lock = threading.Lock()
 
-    def use(self, llm_client: BaseChatModel):
+    def use(self, llm_client: BaseChatModel, warmup: bool = False) -> "ShouldDecorator":
         """
         Configure LLM client
 
         Args:
             llm_client: LLM client object with invoke method
+            warmup: Send a tiny (billed) prompt without blocking so the first test
+                does not pay the connection and client setup cost. The async
+                client is only warmed when use() is called inside a running event loop
 
         Returns:
             self: Support method chaining
         """
         self._llm_client = llm_client
+        if warmup:
+            _start_warm_up(llm_client)
         return self
 
-    def __call__(self, condition: str, llm_client=None):
+    def flush(self) -> None:
+        """
+        Judge all assertions deferred in batch mode, one AI call per LLM client
+
+        Raises:
+            AssertionError: If any deferred assertion failed
+        """
+        failures = []
+        for llm_client, items in _group_by_client(self._take_pending()):
+            verdicts = _call_ai_model_batch(items, llm_client)
+            failures.extend(_collect_failures(items, verdicts))
+        if failures:
+            raise AssertionError("AI assertion failed:\n" + "\n".join(failures))
+
+    async def aflush(self) -> None:
+        """
+        Async version of flush
+
+        Raises:
+            AssertionError: If any deferred assertion failed
+        """
+        failures = []
+        for llm_client, items in _group_by_client(self._take_pending()):
+            verdicts = await _acall_ai_model_batch(items, llm_client)
+            failures.extend(_collect_failures(items, verdicts))
+        if failures:
+            raise AssertionError("AI assertion failed:\n" + "\n".join(failures))
+
+    def _defer(self, item: _PendingAssertion) -> None:
+        with self._pending_lock:
+            self._pending.append(item)
+
+    def _take_pending(self) -> List[_PendingAssertion]:
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def __call__(
+        self,
+        condition: str,
+        llm_client: Optional[BaseChatModel] = None,
+        *,
+        expect: Any = None,
+        capture: Union[str, Tuple[str, ...]] = ("print", "log"),
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
         """
         Decorator call method
 
         Args:
             condition: Natural language description of expected condition
             llm_client: Optional LLM client, uses global configuration if not provided
+            expect: Optional local check of the return result, either a predicate
+                or an (operator, value) tuple such as ("==", 0.2). The AI model is
+                only consulted when the predicate returns None
+            capture: Outputs to capture for the AI model, any of "print" and "log",
+                either a tuple or a single string. Leave out "log" for print-only
+                tests to skip log capturing
 
         Returns:
             Decorator function
         """
+        expect_check = _build_expect_check(expect)
+        if isinstance(capture, str):
+            capture = (capture,)
+        unknown = set(capture) - {"print", "log"}
+        if unknown:
+            raise ValueError(f"Unsupported capture kinds: {', '.join(sorted(unknown))}")
+        capture_logs = "log" in capture
+        capture_prints = "print" in capture
+        prompt_template = _bake_condition(condition)
 
-        def decorator(test_func):
+        def decorator(test_func: Callable[..., Any]) -> Callable[..., Any]:
             # Determine which LLM client to use
             effective_llm = llm_client if llm_client is not None else self._llm_client
-            if effective_llm is None:
+            if effective_llm is None and expect_check is None:
                 raise ValueError(
                     "No LLM client configured, please use should.use(llm) to configure or pass llm_client parameter in decorator"
                 )
+            _install_capture()
             if inspect.iscoroutinefunction(test_func):
                 # Handle async functions
                 @functools.wraps(test_func)
-                async def async_wrapper(*args, **kwargs):
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
                     # Log and output capture containers
-                    captured_logs = []
-                    captured_prints = []
-
-                    # Create standard logging handler
-                    class LogCapture(logging.Handler):
-                        def emit(self, record):
-                            captured_logs.append(
-                                {
-                                    "message": self.format(record),
-                                    "level": record.levelname,
-                                    "timestamp": record.created,
-                                }
-                            )
+                    captured_logs: List[Dict[str, Any]] = []
+                    captured_prints: List[str] = []
 
-                    # Create print output capturer
-                    class PrintCapture(io.StringIO):
-                        def write(self, s):
-                            if s.strip():  # Ignore empty lines
-                                captured_prints.append(s.strip())
-                            return super().write(s)
-
-                    # Add log capturer
-                    log_capture = LogCapture()
-                    root_logger = logging.getLogger()
-                    root_logger.addHandler(log_capture)
-                    original_level = root_logger.level
-                    root_logger.setLevel(logging.INFO)
-
-                    # Capture print output
-                    original_stdout = sys.stdout
-                    print_capture = PrintCapture()
-                    sys.stdout = print_capture
+                    # Start capturing logs and print output of this test
+                    capture_tokens = _start_capture(
+                        captured_logs if capture_logs else None,
+                        captured_prints if capture_prints else None,
+                    )
 
                     try:
                         # Execute the decorated async function
                         actual_result = await test_func(*args, **kwargs)
 
+                        # Decide locally when possible
+                        if expect_check is not None:
+                            decided = expect_check(actual_result)
+                            if decided is not None:
+                                if not decided:
+                                    raise AssertionError(
+                                        f"FAIL: expect check failed for result {actual_result!r}"
+                                    )
+                                return actual_result
+
+                        # In batch mode the judgment happens at flush time
+                        if self.batch_mode and effective_llm is not None:
+                            self._defer(
+                                _PendingAssertion(
+                                    test_func.__qualname__,
+                                    condition,
+                                    captured_logs,
+                                    captured_prints,
+                                    actual_result,
+                                    effective_llm,
+                                )
+                            )
+                            return actual_result
+
                         # Call AI for judgment
-                        verdict = _call_ai_model(
-                            condition, captured_logs, captured_prints, actual_result, effective_llm
+                        verdict = await _acall_ai_model(
+                            condition,
+                            captured_logs,
+                            captured_prints,
+                            actual_result,
+                            effective_llm,
+                            prompt_template,
                         )
-                        if not verdict.startswith("PASS"):
+                        if not _is_pass(verdict):
                             raise AssertionError(f"AI assertion failed: {verdict}")
 
                         return actual_result
 
                     finally:
-                        # Restore standard output
-                        sys.stdout = original_stdout
-                        # Clean up log handler
-                        root_logger.removeHandler(log_capture)
-                        root_logger.setLevel(original_level)
+                        _stop_capture(capture_tokens)
 
                 return async_wrapper
 
             else:
                 # Handle sync functions
                 @functools.wraps(test_func)
-                def sync_wrapper(*args, **kwargs):
+                def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
                     # Log and output capture containers
-                    captured_logs = []
-                    captured_prints = []
-
-                    # Create standard logging handler
-                    class LogCapture(logging.Handler):
-                        def emit(self, record):
-                            captured_logs.append(
-                                {
-                                    "message": self.format(record),
-                                    "level": record.levelname,
-                                    "timestamp": record.created,
-                                }
-                            )
+                    captured_logs: List[Dict[str, Any]] = []
+                    captured_prints: List[str] = []
 
-                    # Create print output capturer
-                    class PrintCapture(io.StringIO):
-                        def write(self, s):
-                            if s.strip():  # Ignore empty lines
-                                captured_prints.append(s.strip())
-                            return super().write(s)
-
-                    # Add log capturer
-                    log_capture = LogCapture()
-                    root_logger = logging.getLogger()
-                    root_logger.addHandler(log_capture)
-                    original_level = root_logger.level
-                    root_logger.setLevel(logging.INFO)
-
-                    # Capture print output
-                    original_stdout = sys.stdout
-                    print_capture = PrintCapture()
-                    sys.stdout = print_capture
+                    # Start capturing logs and print output of this test
+                    capture_tokens = _start_capture(
+                        captured_logs if capture_logs else None,
+                        captured_prints if capture_prints else None,
+                    )
 
                     try:
                         # Execute the decorated sync function
                         actual_result = test_func(*args, **kwargs)
 
+                        # Decide locally when possible
+                        if expect_check is not None:
+                            decided = expect_check(actual_result)
+                            if decided is not None:
+                                if not decided:
+                                    raise AssertionError(
+                                        f"FAIL: expect check failed for result {actual_result!r}"
+                                    )
+                                return actual_result
+
+                        # In batch mode the judgment happens at flush time
+                        if self.batch_mode and effective_llm is not None:
+                            self._defer(
+                                _PendingAssertion(
+                                    test_func.__qualname__,
+                                    condition,
+                                    captured_logs,
+                                    captured_prints,
+                                    actual_result,
+                                    effective_llm,
+                                )
+                            )
+                            return actual_result
+
                         # Call AI for judgment
                         verdict = _call_ai_model(
-                            condition, captured_logs, captured_prints, actual_result, effective_llm
+                            condition,
+                            captured_logs,
+                            captured_prints,
+                            actual_result,
+                            effective_llm,
+                            prompt_template,
                         )
-                        if not verdict.startswith("PASS"):
+                        if not _is_pass(verdict):
                             raise AssertionError(verdict)
 
                         return actual_result
 
                     finally:
-                        # Restore standard output
-                        sys.stdout = original_stdout
-                        # Clean up log handler
-                        root_logger.removeHandler(log_capture)
-                        root_logger.setLevel(original_level)
+                        _stop_capture(capture_tokens)
 
                 return sync_wrapper
 
         return decorator
 
 
+def _compare_to_expected(compare: Callable[[Any, Any], Any], expected: Any, actual: Any) -> Any:
+    """Apply an expect operator to the actual and expected values"""
+    return compare(actual, expected)
+
+
+def _build_expect_check(expect: Any) -> Optional[Callable[[Any], Optional[bool]]]:
+    """
+    Turn the expect argument of the decorator into a predicate
+
+    Args:
+        expect: None, a predicate, or an (operator, value) tuple
+
+    Returns:
+        Predicate returning True/False when decided and None when the AI model
+        should judge, or None if no local check was requested
+    """
+    if expect is None:
+        return None
+
+    predicate: Callable[[Any], Any]
+    if callable(expect):
+        predicate = expect
+    elif isinstance(expect, tuple) and len(expect) == 2:
+        op, expected = expect
+        compare = _EXPECT_OPERATORS.get(op) if isinstance(op, str) else op
+        if not callable(compare):
+            raise ValueError(
+                f"Unsupported expect operator {op!r}, use one of {', '.join(_EXPECT_OPERATORS)}"
+            )
+        predicate = functools.partial(_compare_to_expected, compare, expected)
+    else:
+        raise ValueError("expect must be a callable or an (operator, value) tuple")
+
+    def check(actual_result: Any) -> Optional[bool]:
+        decided = predicate(actual_result)
+        return None if decided is None else bool(decided)
+
+    return check
+
+
+class _VerdictCache:
+    """
+    Thread-safe LRU cache of AI verdicts whose entries expire after ttl seconds
+
+    Only passing verdicts are stored, so a flaky FAIL is judged again on rerun.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, verdict = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return verdict
+
+    def put(self, key: bytes, verdict: str) -> None:
+        if self.ttl <= 0 or not _is_pass(verdict):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def _cache_key(
+    condition: str,
+    logs: List[Dict[str, Any]],
+    prints: List[str],
+    actual_result: Any,
+    llm_client: BaseChatModel,
+) -> bytes:
+    """
+    Hash the judgment inputs into a verdict cache key
+
+    Log timestamps are left out so that identical reruns map to the same key.
+    """
+    payload = _json_dumps(
+        [
+            condition,
+            [[log["level"], log["message"]] for log in logs],
+            prints,
+            repr(actual_result),
+            id(llm_client),
+        ]
+    )
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _with_omitted_note(text: str, total: int, kept: int) -> str:
+    """Prefix serialized entries with a note when older entries were dropped"""
+    omitted = total - kept
+    if omitted:
+        return f"({omitted} earlier entries omitted)\n{text}"
+    return text
+
+
+def _format_logs(logs: List[Dict[str, Any]]) -> str:
+    """
+    Serialize captured logs for the prompt, keeping only the most recent ones
+
+    Args:
+        logs: List of captured logs
+
+    Returns:
+        Compact JSON text
+    """
+    if not logs:
+        return "No log output"
+
+    tail = logs[-_MAX_PROMPT_ENTRIES:]
+    text = _json_dumps(tail).decode("utf-8")
+    return _with_omitted_note(text, len(logs), len(tail))
+
+
+def _format_prints(prints: List[str]) -> str:
+    """
+    Render captured print outputs for the prompt as a plain bullet list
+
+    Args:
+        prints: List of captured print outputs
+
+    Returns:
+        One "- " line per print, keeping only the most recent ones
+    """
+    if not prints:
+        return "No print output"
+
+    tail = prints[-_MAX_PROMPT_ENTRIES:]
+    text = "\n".join("- " + line.replace("\n", "\n  ") for line in tail)
+    return _with_omitted_note(text, len(prints), len(tail))
+
+
+def _bake_condition(condition: str) -> str:
+    """
+    Fill the condition into the judgment prompt once per decorated function
+
+    Args:
+        condition: Natural language description of expected condition
+
+    Returns:
+        Prompt template with only {logs}, {prints} and {result} left to fill
+    """
+    escaped = condition.replace("{", "{{").replace("}", "}}")
+    return _PROMPT_TEMPLATE.format(
+        condition=escaped, logs="{logs}", prints="{prints}", result="{result}"
+    )
+
+
+def _build_prompt(
+    prompt_template: str,
+    logs: List[Dict[str, Any]],
+    prints: List[str],
+    actual_result: Any = None,
+) -> str:
+    """
+    Build the judgment prompt sent to the AI model
+
+    Args:
+        prompt_template: Prompt with the condition already filled in, see _bake_condition
+        logs: List of captured logs
+        prints: List of captured print outputs
+        actual_result: Actual return result of the function
+
+    Returns:
+        Prompt text
+    """
+    return prompt_template.format(
+        logs=_format_logs(logs),
+        prints=_format_prints(prints),
+        result=actual_result,
+    )
+
+
+def _extract_verdict(response: Any) -> str:
+    """
+    Extract the verdict text from an AI model response
+
+    Args:
+        response: Message returned by the LLM client
+
+    Returns:
+        Verdict string
+    """
+    # 确保返回的是字符串类型
+    content = response.content
+    if isinstance(content, str):
+        return content
+    else:
+        return str(content) if content is not None else "FAIL: Empty response from AI"
+
+
+def _is_pass(verdict: str) -> bool:
+    """Check whether a verdict passes, ignoring case and leading whitespace"""
+    return _PASS_RE.match(verdict) is not None
+
+
+def _normalize_verdict(text: str) -> str:
+    """
+    Normalize an AI model reply to "PASS" or "FAIL: reason"
+
+    Args:
+        text: Raw reply, possibly with surrounding whitespace or lowercase keywords
+
+    Returns:
+        Normalized verdict
+    """
+    match = _VERDICT_RE.match(text)
+    if match is None:
+        return text.strip() or "FAIL: Empty response from AI"
+    status, reason = match.groups()
+    if status.upper() == "PASS":
+        return "PASS"
+    return f"FAIL: {reason or 'No reason given'}"
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Extract the text of a streamed AI model chunk"""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return str(content) if content is not None else ""
+
+
+def _stream_verdict(llm_client: BaseChatModel, prompt: str) -> str:
+    """
+    Stream the AI model response, deciding on PASS as soon as it is read
+
+    The stream is still consumed to the end so that callbacks and tracers see a
+    finished run and the connection can be reused; only the text after "PASS"
+    is no longer collected. A failing verdict keeps its full reason.
+    """
+    text = ""
+    passed = False
+    for chunk in llm_client.stream(prompt):
+        if not passed:
+            text += _chunk_text(chunk)
+            passed = _STREAM_PASS_RE.match(text) is not None
+    return "PASS" if passed else _normalize_verdict(text)
+
+
+async def _astream_verdict(llm_client: BaseChatModel, prompt: str) -> str:
+    """Async version of _stream_verdict"""
+    text = ""
+    passed = False
+    async for chunk in llm_client.astream(prompt):
+        if not passed:
+            text += _chunk_text(chunk)
+            passed = _STREAM_PASS_RE.match(text) is not None
+    return "PASS" if passed else _normalize_verdict(text)
+
+
 def _call_ai_model(
     condition: str,
     logs: List[Dict[str, Any]],
     prints: List[str],
     actual_result: Any = None,
     llm_client: Optional[BaseChatModel] = None,
+    prompt_template: Optional[str] = None,
 ) -> str:
     """
     Call AI model for judgment
@@ -198,6 +824,7 @@ def _call_ai_model(
         prints: List of captured print outputs
         actual_result: Actual return result of the function
         llm_client: LLM client object
+        prompt_template: Prompt prepared by _bake_condition, built from condition if omitted
 
     Returns:
         AI judgment result, starting with "PASS" or "FAIL:"
@@ -205,37 +832,219 @@ def _call_ai_model(
     if llm_client is None:
         return "FAIL: No LLM client configured"
 
-    # Build prompt
-    prompt = textwrap.dedent(
-        f"""
-    Below is the context information from a test execution, expected condition: "{condition}"
-    
-    Execution logs:
-    {json.dumps(logs, ensure_ascii=False, indent=2) if logs else "No log output"}
-    
-    Print outputs:
-    {json.dumps(prints, ensure_ascii=False, indent=2) if prints else "No print output"}
-    
-    Function return result:
-    {actual_result}
-    
-    Please judge whether the expected condition is satisfied based on logs, print outputs and return result. Response format:
-    PASS  or  FAIL: specific reason
-    No additional explanation needed.
+    key = _cache_key(condition, logs, prints, actual_result, llm_client)
+    cached = _verdict_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if prompt_template is None:
+        prompt_template = _bake_condition(condition)
+    prompt = _build_prompt(prompt_template, logs, prints, actual_result)
+
+    try:
+        verdict = _stream_verdict(llm_client, prompt)
+    except Exception as e:
+        return f"FAIL: AI call failed - {str(e)}"
+
+    _verdict_cache.put(key, verdict)
+    return verdict
+
+
+async def _acall_ai_model(
+    condition: str,
+    logs: List[Dict[str, Any]],
+    prints: List[str],
+    actual_result: Any = None,
+    llm_client: Optional[BaseChatModel] = None,
+    prompt_template: Optional[str] = None,
+) -> str:
+    """
+    Async version of _call_ai_model, streams the LLM without blocking the event loop
+
+    Args:
+        condition: Natural language description of expected condition
+        logs: List of captured logs
+        prints: List of captured print outputs
+        actual_result: Actual return result of the function
+        llm_client: LLM client object
+        prompt_template: Prompt prepared by _bake_condition, built from condition if omitted
+
+    Returns:
+        AI judgment result, starting with "PASS" or "FAIL:"
     """
+    if llm_client is None:
+        return "FAIL: No LLM client configured"
+
+    key = _cache_key(condition, logs, prints, actual_result, llm_client)
+    cached = _verdict_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if prompt_template is None:
+        prompt_template = _bake_condition(condition)
+    prompt = _build_prompt(prompt_template, logs, prints, actual_result)
+
+    try:
+        verdict = await _astream_verdict(llm_client, prompt)
+    except Exception as e:
+        return f"FAIL: AI call failed - {str(e)}"
+
+    _verdict_cache.put(key, verdict)
+    return verdict
+
+
+def _group_by_client(
+    pending: List[_PendingAssertion],
+) -> List[Tuple[BaseChatModel, List[_PendingAssertion]]]:
+    """Group deferred assertions by the LLM client that should judge them"""
+    groups: Dict[int, Tuple[BaseChatModel, List[_PendingAssertion]]] = {}
+    for item in pending:
+        groups.setdefault(id(item.llm_client), (item.llm_client, []))[1].append(item)
+    return list(groups.values())
+
+
+def _collect_failures(items: List[_PendingAssertion], verdicts: List[str]) -> List[str]:
+    """Format the failed verdicts of a batch as "<test name>: <verdict>" lines"""
+    return [
+        f"{item.name}: {verdict}" for item, verdict in zip(items, verdicts) if not _is_pass(verdict)
+    ]
+
+
+def _build_batch_prompt(items: List[_PendingAssertion]) -> str:
+    """
+    Build a single prompt asking the AI model to judge several tests
+
+    Args:
+        items: Deferred assertions, numbered from 1 in the prompt
+
+    Returns:
+        Prompt text
+    """
+    return _BATCH_PROMPT_TEMPLATE.format(
+        count=len(items),
+        items="\n\n".join(
+            _BATCH_ITEM_TEMPLATE.format(
+                index=index,
+                condition=item.condition,
+                logs=_format_logs(item.logs),
+                prints=_format_prints(item.prints),
+                result=item.actual_result,
+            )
+            for index, item in enumerate(items, 1)
+        ),
     )
 
+
+def _parse_batch_verdicts(content: str, count: int) -> List[Optional[str]]:
+    """
+    Split a batch response into one verdict per test
+
+    Args:
+        content: Text returned by the AI model
+        count: Number of tests in the batch
+
+    Returns:
+        Verdicts in test order, None for tests the AI model did not answer
+    """
+    verdicts: List[Optional[str]] = [None] * count
+    for match in _BATCH_VERDICT_RE.finditer(content):
+        status, number, reason = match.groups()
+        index = int(number) - 1
+        if 0 <= index < count:
+            if status.upper() == "PASS":
+                verdicts[index] = "PASS"
+            else:
+                verdicts[index] = f"FAIL: {reason or 'No reason given'}"
+    return verdicts
+
+
+def _prepare_batch(
+    items: List[_PendingAssertion], llm_client: BaseChatModel
+) -> Tuple[List[Optional[str]], List[bytes], List[int]]:
+    """
+    Resolve cached verdicts of a batch
+
+    Returns:
+        Verdicts (None where still unknown), cache keys, and indexes still to be judged
+    """
+    keys = [
+        _cache_key(item.condition, item.logs, item.prints, item.actual_result, llm_client)
+        for item in items
+    ]
+    verdicts = [_verdict_cache.get(key) for key in keys]
+    missing = [index for index, verdict in enumerate(verdicts) if verdict is None]
+    return verdicts, keys, missing
+
+
+def _finish_batch(
+    verdicts: List[Optional[str]],
+    keys: List[bytes],
+    missing: List[int],
+    judged: List[Optional[str]],
+) -> List[str]:
+    """Merge freshly judged verdicts into the batch and cache them"""
+    for index, verdict in zip(missing, judged):
+        if verdict is not None:
+            verdicts[index] = verdict
+            _verdict_cache.put(keys[index], verdict)
+    return [verdict or "FAIL: No verdict returned for this test" for verdict in verdicts]
+
+
+def _call_ai_model_batch(items: List[_PendingAssertion], llm_client: BaseChatModel) -> List[str]:
+    """
+    Judge several deferred assertions with a single AI call
+
+    Args:
+        items: Deferred assertions sharing the same LLM client
+        llm_client: LLM client object
+
+    Returns:
+        Verdicts in item order, each starting with "PASS" or "FAIL:"
+    """
+    verdicts, keys, missing = _prepare_batch(items, llm_client)
+    if not missing:
+        return _finish_batch(verdicts, keys, missing, [])
+
+    prompt = _build_batch_prompt([items[index] for index in missing])
+
     try:
         response = llm_client.invoke(prompt)
-        # 确保返回的是字符串类型
-        content = response.content
-        if isinstance(content, str):
-            return content
-        else:
-            return str(content) if content is not None else "FAIL: Empty response from AI"
     except Exception as e:
-        return f"FAIL: AI call failed - {str(e)}"
+        return [verdict or f"FAIL: AI call failed - {str(e)}" for verdict in verdicts]
+
+    judged = _parse_batch_verdicts(_extract_verdict(response), len(missing))
+    return _finish_batch(verdicts, keys, missing, judged)
+
+
+async def _acall_ai_model_batch(
+    items: List[_PendingAssertion], llm_client: BaseChatModel
+) -> List[str]:
+    """
+    Async version of _call_ai_model_batch
+
+    Args:
+        items: Deferred assertions sharing the same LLM client
+        llm_client: LLM client object
+
+    Returns:
+        Verdicts in item order, each starting with "PASS" or "FAIL:"
+    """
+    verdicts, keys, missing = _prepare_batch(items, llm_client)
+    if not missing:
+        return _finish_batch(verdicts, keys, missing, [])
+
+    prompt = _build_batch_prompt([items[index] for index in missing])
+
+    try:
+        response = await llm_client.ainvoke(prompt)
+    except Exception as e:
+        return [verdict or f"FAIL: AI call failed - {str(e)}" for verdict in verdicts]
+
+    judged = _parse_batch_verdicts(_extract_verdict(response), len(missing))
+    return _finish_batch(verdicts, keys, missing, judged)
+
 
+_verdict_cache = _VerdictCache(_CACHE_MAXSIZE, _CACHE_TTL)
 
 # Create global instance
 should = ShouldDecorator()